@@ -1,18 +1,143 @@
+import io
 import os
 import requests
 import zipfile
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from tqdm import tqdm
-import shutil
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 # --- Configuration ---
 SYMBOL = "BTCUSDT"
 YEAR = "2024"
 MONTHS = range(1, 13)
 OUTPUT_DIR = "data"
+FINAL_PARQUET_NAME = "your_binance_futures_data_2024.parquet"
 FINAL_CSV_NAME = "your_binance_futures_data_2024.csv"
+EXPORT_CSV = False  # Also write the combined data as CSV (slow, for external tools)
 BASE_URL = f"https://data.binance.vision/data/futures/um/monthly/klines/{SYMBOL}/1m/"
-TEMP_DIR = "temp_downloads"
+MAX_WORKERS = 12
+CHUNK_SIZE = 1024 * 1024  # 1 MiB
+USE_RANGE_REQUESTS = True  # Split large files into parallel byte-range requests
+RANGE_PART_SIZE = 10 * 1024 * 1024  # 10 MiB per ranged request
+RANGE_WORKERS = 4  # Concurrent ranged requests per file
+
+COLUMN_NAMES = ['open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time',
+                'quote_asset_volume', 'number_of_trades', 'taker_buy_base_asset_volume',
+                'taker_buy_quote_asset_volume', 'ignore']
+COLUMN_TYPES = {'open_time': pa.int64(), 'open': pa.float64(), 'high': pa.float64(),
+                'low': pa.float64(), 'close': pa.float64(), 'volume': pa.float64()}
+
+def create_session():
+    """
+    Creates a requests session whose connection pool is large enough for every
+    download worker to keep its own keep-alive connection.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS * RANGE_WORKERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_content_length(session, url):
+    """
+    Returns the file size advertised by a HEAD request, or None if unknown.
+    """
+    response = session.head(url, timeout=30, allow_redirects=True)
+    response.raise_for_status()
+    content_length = response.headers.get("Content-Length")
+    return int(content_length) if content_length else None
+
+def parts_generator(size, part=RANGE_PART_SIZE):
+    """
+    Yields inclusive (start, end) byte offsets covering a file of `size` bytes.
+    """
+    for start in range(0, size, part):
+        yield start, min(start + part, size) - 1
+
+def download_part(session, url, buffer, start, end):
+    """
+    Fetches bytes [start, end] of `url` into the same offsets of `buffer`.
+    Returns False if the server ignored the Range header.
+    """
+    headers = {"Range": f"bytes={start}-{end}"}
+    with session.get(url, headers=headers, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        if response.status_code != 206:
+            return False
+
+        view = memoryview(buffer)
+        offset = start
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            view[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+    return True
+
+def download_in_parts(session, url, size):
+    """
+    Downloads `url` as parallel byte ranges into a pre-allocated buffer.
+    Returns None if the server does not support range requests.
+    """
+    buffer = bytearray(size)
+    parts = list(parts_generator(size, RANGE_PART_SIZE))
+    with ThreadPoolExecutor(max_workers=RANGE_WORKERS) as executor:
+        results = list(executor.map(lambda part: download_part(session, url, buffer, *part), parts))
+    return io.BytesIO(buffer) if all(results) else None
+
+def download_whole(session, url):
+    """
+    Downloads `url` with a single streamed GET into memory.
+    """
+    buffer = io.BytesIO()
+    with session.get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            buffer.write(chunk)
+    buffer.seek(0)
+    return buffer
+
+def read_kline_csv(csv_file):
+    """
+    Parses one monthly kline CSV into an Arrow table using all cores.
+    Binance added a header row to its monthly files at some point; detect it so
+    the row can be skipped instead of breaking the typed columns.
+    """
+    skip_rows = 0 if csv_file.peek(1)[:1].isdigit() else 1
+    read_options = pacsv.ReadOptions(column_names=COLUMN_NAMES, skip_rows=skip_rows,
+                                     use_threads=True, block_size=16 << 20)
+    convert_options = pacsv.ConvertOptions(column_types=COLUMN_TYPES,
+                                           include_columns=list(COLUMN_TYPES))
+    return pacsv.read_csv(csv_file, read_options=read_options, convert_options=convert_options)
+
+def download_month(session, url):
+    """
+    Downloads a single monthly ZIP into memory and parses the CSVs inside it
+    without extracting anything to disk. Returns a list of Arrow tables.
+    """
+    file_name = url.rsplit("/", 1)[-1]
+    try:
+        size = get_content_length(session, url) if USE_RANGE_REQUESTS else None
+        buffer = None
+        if size and size > RANGE_PART_SIZE:
+            buffer = download_in_parts(session, url, size)
+        if buffer is None:
+            buffer = download_whole(session, url)
+
+        with zipfile.ZipFile(buffer) as zip_ref:
+            tables = []
+            for name in zip_ref.namelist():
+                if name.endswith('.csv'):
+                    with zip_ref.open(name) as csv_file:
+                        tables.append(read_kline_csv(csv_file))
+            return tables
+
+    except requests.exceptions.HTTPError as e:
+        print(f"Warning: Could not download {url}. Status code: {e.response.status_code}. Skipping {file_name}.")
+    except Exception as e:
+        print(f"An error occurred for {file_name}: {e}")
+    return []
 
 def download_and_process_data():
     """
@@ -21,81 +146,46 @@ def download_and_process_data():
     print("--- Starting Automated Data Download ---")
 
     # --- 1. Setup Directories ---
-    if os.path.exists(TEMP_DIR):
-        print(f"Cleaning up old files from '{TEMP_DIR}' directory...")
-        shutil.rmtree(TEMP_DIR)
-    
-    os.makedirs(TEMP_DIR)
-    
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR)
     
-    # --- 2. Download and Unzip Monthly Files ---
-    for month in tqdm(MONTHS, desc="Downloading Monthly Files"):
-        month_str = f"{month:02d}"
-        file_name = f"{SYMBOL}-1m-{YEAR}-{month_str}"
-        zip_file_path = os.path.join(TEMP_DIR, f"{file_name}.zip")
-        
-        url = f"{BASE_URL}{file_name}.zip"
-        try:
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
-            
-            with open(zip_file_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                zip_ref.extractall(TEMP_DIR)
-            
-            os.remove(zip_file_path)
-
-        except requests.exceptions.HTTPError as e:
-            print(f"Warning: Could not download {url}. Status code: {e.response.status_code}. Skipping month {month_str}.")
-        except Exception as e:
-            print(f"An error occurred for month {month_str}: {e}")
-
-    # --- 3. Combine CSV files ---
-    print("\n--- Combining all monthly CSV files ---")
-    all_csv_files = [os.path.join(TEMP_DIR, f) for f in os.listdir(TEMP_DIR) if f.endswith('.csv')]
-    all_csv_files.sort()
-
-    if not all_csv_files:
-        print("No CSV files found to combine. Exiting.")
-        return
+    # --- 2. Download and Parse Monthly Files (in parallel) ---
+    urls = [f"{BASE_URL}{SYMBOL}-1m-{YEAR}-{month:02d}.zip" for month in MONTHS]
+    with create_session() as session, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        downloads = executor.map(lambda url: download_month(session, url), urls)
+        monthly_tables = list(tqdm(downloads, total=len(urls), desc="Downloading Monthly Files"))
 
-    col_names = ['open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time', 
-                 'quote_asset_volume', 'number_of_trades', 'taker_buy_base_asset_volume', 
-                 'taker_buy_quote_asset_volume', 'ignore']
+    # --- 3. Combine monthly tables ---
+    print("\n--- Combining all monthly data ---")
+    # executor.map preserves the month order, so no re-sort is needed
+    tables = [table for month in monthly_tables for table in month]
 
-    df_list = [pd.read_csv(f, header=None, names=col_names, low_memory=False) for f in tqdm(all_csv_files, desc="Reading CSVs")]
-    
-    master_df = pd.concat(df_list, ignore_index=True)
+    if not tables:
+        print("No monthly data found to combine. Exiting.")
+        return
+
+    table = pa.concat_tables(tables)
 
-    # --- 4. Format the DataFrame (NEW ROBUST METHOD) ---
+    # --- 4. Format the data ---
     print("--- Formatting data ---")
-    
-    # Force the 'open_time' column to be numeric. Any text will become an empty value (NaN).
-    master_df['open_time'] = pd.to_numeric(master_df['open_time'], errors='coerce')
-    
-    # Drop any rows where 'open_time' is now empty. This removes the bad header row.
-    master_df.dropna(subset=['open_time'], inplace=True)
-    
-    # Now that it's clean, safely convert the column to integers.
-    master_df['open_time'] = master_df['open_time'].astype('int64')
 
-    # Proceed with the original conversion, which will now succeed.
-    master_df['timestamp'] = pd.to_datetime(master_df['open_time'], unit='ms')
-    final_df = master_df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
-    
-    # --- 5. Save the Final CSV and Clean Up ---
-    final_output_path = os.path.join(OUTPUT_DIR, FINAL_CSV_NAME)
-    final_df.to_csv(final_output_path, index=False)
+    # Header rows were skipped while parsing, so open_time is already int64 and can be
+    # cast to a millisecond timestamp in Arrow before the single conversion to pandas
+    timestamps = table.column('open_time').cast(pa.timestamp('ms'))
+    table = table.set_column(table.schema.get_field_index('open_time'), 'timestamp', timestamps)
+    final_df = table.to_pandas(self_destruct=True, split_blocks=True)
     
+    # --- 5. Save the Final Parquet (and optional CSV) ---
+    final_output_path = os.path.join(OUTPUT_DIR, FINAL_PARQUET_NAME)
+    final_df.to_parquet(final_output_path, engine="pyarrow", compression="zstd",
+                        row_group_size=131072, index=False)
+
     print(f"\nSuccessfully created final data file at: {final_output_path}")
-    
-    shutil.rmtree(TEMP_DIR)
-    print(f"Cleaned up temporary directory: '{TEMP_DIR}'")
+
+    if EXPORT_CSV:
+        csv_output_path = os.path.join(OUTPUT_DIR, FINAL_CSV_NAME)
+        final_df.to_csv(csv_output_path, index=False)
+        print(f"Exported CSV copy to: {csv_output_path}")
     
     print("--- Automation Complete ---")
 
@@ -2,26 +2,55 @@ import pandas as pd
 import os
 
 # --- Configuration ---
-REPORT_FILE = 'report.csv'
+REPORT_FILE = 'report.feather'
 PATTERNS_DIR = 'patterns'
 HTML_PLOTS_DIR = 'html_plots'
 OUTPUT_FILE = 'index.html'
+# Per-pattern file paths, joined once rather than for every card
+PNG_PATH_TEMPLATE = os.path.join(PATTERNS_DIR, "cup_handle_{}.png")
+HTML_PLOT_PATH_TEMPLATE = os.path.join(HTML_PLOTS_DIR, "cup_handle_{}.html")
 
-def create_summary_dashboard():
+def png_grid_item(pattern_id):
+    """Returns the grid card showing the static image of one pattern."""
+    png_path = PNG_PATH_TEMPLATE.format(pattern_id)
+    # The img tag calls the openModal function
+    return f"""
+                <div class="grid-item">
+                    <h4>Pattern #{pattern_id}</h4>
+                    <img src="{png_path}" alt="Pattern #{pattern_id}" onclick="openModal(this.src)">
+                </div>
+        """
+
+def plot_grid_item(pattern_id):
+    """Returns the grid card embedding the interactive plot of one pattern."""
+    html_plot_path = HTML_PLOT_PATH_TEMPLATE.format(pattern_id)
+    return f"""
+                <div class="grid-item">
+                    <h4>Pattern #{pattern_id}</h4>
+                    <iframe src="{html_plot_path}"></iframe>
+                    <a href="{html_plot_path}" target="_blank">Open Full Interactive Chart</a>
+                </div>
+        """
+
+def create_summary_dashboard(df=None):
     """
-    Reads the report.csv and generates an interactive summary HTML dashboard.
+    Generates an interactive summary HTML dashboard from the report DataFrame.
+    When no DataFrame is passed in, the report is read from report.feather.
     """
-    print(f"Reading analysis results from {REPORT_FILE}...")
-    try:
-        df = pd.read_csv(REPORT_FILE)
-    except FileNotFoundError:
-        print(f"Error: {REPORT_FILE} not found. Please run main.py first.")
-        return
+    if df is None:
+        print(f"Reading analysis results from {REPORT_FILE}...")
+        try:
+            df = pd.read_feather(REPORT_FILE)
+        except FileNotFoundError:
+            print(f"Error: {REPORT_FILE} not found. Please run main.py first.")
+            return
 
     print(f"Generating interactive dashboard at {OUTPUT_FILE}...")
+    pattern_ids = df['pattern_id'].to_numpy()
 
     # --- Start of HTML Content ---
-    html_content = f"""
+    # Sections are collected in a list and joined once at the end
+    html_parts = [f"""
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -71,56 +100,38 @@ def create_summary_dashboard():
             <h2>Static Pattern Images</h2>
             <p>Click on any image to see a larger preview.</p>
             <div class="grid-container">
-    """
-    for index, row in df.iterrows():
-        pattern_id = row['pattern_id']
-        png_path = os.path.join(PATTERNS_DIR, f"cup_handle_{pattern_id}.png")
-        # Updated img tag to call the openModal function
-        html_content += f"""
-                <div class="grid-item">
-                    <h4>Pattern #{pattern_id}</h4>
-                    <img src="{png_path}" alt="Pattern #{pattern_id}" onclick="openModal(this.src)">
-                </div>
-        """
-    html_content += "</div></div>"
+    """]
+    html_parts.extend(png_grid_item(pattern_id) for pattern_id in pattern_ids)
+    html_parts.append("</div></div>")
 
     # --- Interactive Plots Section (with new 2-column grid) ---
-    html_content += """
+    html_parts.append("""
         <div id="plots" class="content-section">
             <h2>Interactive Plot Previews</h2>
             <p>Click the link below each preview to open the fully interactive chart in a new tab.</p>
             <div class="grid-container-plots">
-    """
-    for index, row in df.iterrows():
-        pattern_id = row['pattern_id']
-        html_plot_path = os.path.join(HTML_PLOTS_DIR, f"cup_handle_{pattern_id}.html")
-        html_content += f"""
-                <div class="grid-item">
-                    <h4>Pattern #{pattern_id}</h4>
-                    <iframe src="{html_plot_path}"></iframe>
-                    <a href="{html_plot_path}" target="_blank">Open Full Interactive Chart</a>
-                </div>
-        """
-    html_content += "</div></div>"
+    """)
+    html_parts.extend(plot_grid_item(pattern_id) for pattern_id in pattern_ids)
+    html_parts.append("</div></div>")
 
     # --- Full Report Section ---
-    html_content += f"""
+    html_parts.append(f"""
         <div id="report" class="content-section">
             <h2>Full Data Report</h2>
             {df.to_html(index=False)}
         </div>
-    """
+    """)
 
     # --- New Modal HTML Structure ---
-    html_content += """
+    html_parts.append("""
         <div id="myModal" class="modal">
             <span class="close" onclick="closeModal()">&times;</span>
             <img class="modal-content" id="modalImage">
         </div>
-    """
+    """)
 
     # --- JavaScript for controls and modal ---
-    html_content += """
+    html_parts.append("""
         <script>
             // Get modal elements
             var modal = document.getElementById("myModal");
@@ -153,10 +164,10 @@ def create_summary_dashboard():
         </script>
     </body>
     </html>
-    """
+    """)
 
     with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+        f.write("".join(html_parts))
     
     print("Interactive dashboard generated successfully!")
 
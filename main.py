@@ -1,16 +1,38 @@
 import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import os
-import subprocess  # Import the subprocess module
 from pattern_detector import PatternDetector
-from plot_utils import plot_and_save
+from plot_utils import plot_patterns
+from generate_summary import create_summary_dashboard
 
 # --- CONFIGURATION ---
-DATA_FILE = os.path.join('data', 'your_binance_futures_data_2024.csv')
+DATA_FILE = os.path.join('data', 'your_binance_futures_data_2024.parquet')
+CSV_DATA_FILE = os.path.join('data', 'your_binance_futures_data_2024.csv')
+DATA_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
 PATTERNS_DIR = 'patterns'
 HTML_PLOTS_DIR = 'html_plots'
-REPORT_FILE = 'report.csv'
+REPORT_FILE = 'report.feather'
+CSV_REPORT_FILE = 'report.csv'
+EXPORT_CSV_REPORT = False  # Also write the report as CSV (e.g. for spreadsheets)
 MAX_PATTERNS_TO_PLOT = 30
 
+def load_data():
+    """
+    Loads the OHLCV data from the Parquet cache, falling back to a CSV export
+    when no Parquet file is available.
+    """
+    if os.path.exists(DATA_FILE):
+        # Memory-map the file so repeated runs read straight from the page cache
+        table = pq.read_table(DATA_FILE, columns=DATA_COLUMNS, memory_map=True, use_threads=True)
+        # Sort in Arrow so the sort_index() after loading finds the data already ordered
+        table = table.take(pc.sort_indices(table, sort_keys=[('timestamp', 'ascending')]))
+        return table.to_pandas(self_destruct=True)
+    if os.path.exists(CSV_DATA_FILE):
+        print(f"Parquet cache not found, reading {CSV_DATA_FILE} instead...")
+        return pd.read_csv(CSV_DATA_FILE, usecols=DATA_COLUMNS)
+    raise FileNotFoundError(DATA_FILE)
+
 def main():
     """
     Main execution function.
@@ -29,7 +51,7 @@ def main():
     # --- 2. LOAD DATA ---
     print(f"Loading data from {DATA_FILE}...")
     try:
-        df = pd.read_csv(DATA_FILE)
+        df = load_data()
         df['timestamp'] = pd.to_datetime(df['timestamp'])
         df = df.set_index('timestamp', drop=False)
         df = df.sort_index()
@@ -53,15 +75,12 @@ def main():
     print(f"\nFound {len(valid_patterns)} valid patterns. Preparing to plot and generate report.")
     
     # --- 4. PLOT PATTERNS AND GENERATE REPORT ---
-    plotted_count = 0
+    patterns_to_plot = valid_patterns[:MAX_PATTERNS_TO_PLOT]
+    plot_patterns(df, patterns_to_plot, PATTERNS_DIR, HTML_PLOTS_DIR)
+    plotted_count = len(patterns_to_plot)
     patterns_for_report = []
 
     for pattern in valid_patterns:
-        if plotted_count < MAX_PATTERNS_TO_PLOT:
-            print(f"\nProcessing pattern #{pattern['pattern_id']}...")
-            plot_and_save(df, pattern, PATTERNS_DIR, HTML_PLOTS_DIR)
-            plotted_count += 1
-        
         report_entry = pattern.copy()
         del report_entry['indices']
         del report_entry['poly_coeffs']
@@ -72,17 +91,18 @@ def main():
 
     # --- 5. SAVE REPORT ---
     report_df = pd.DataFrame(patterns_for_report)
-    report_df.to_csv(REPORT_FILE, index=False)
+    report_df.to_feather(REPORT_FILE)
     print(f"\nValidation summary report saved to '{REPORT_FILE}'.")
+    if EXPORT_CSV_REPORT:
+        report_df.to_csv(CSV_REPORT_FILE, index=False)
+        print(f"Exported CSV copy of the report to '{CSV_REPORT_FILE}'.")
     
-    # --- 6. GENERATE FINAL HTML DASHBOARD (NEW STEP) ---
+    # --- 6. GENERATE FINAL HTML DASHBOARD ---
     try:
         print("\n--- Running Summary Generation ---")
-        # This command runs the new script as a separate process
-        subprocess.run(["python", "generate_summary.py"], check=True)
-    except FileNotFoundError:
-        print("Error: Could not find 'generate_summary.py'. Make sure it's in the same directory.")
-    except subprocess.CalledProcessError as e:
+        # Reuse the in-memory report instead of re-reading it in a new interpreter
+        create_summary_dashboard(report_df)
+    except Exception as e:
         print(f"Error occurred while generating the summary dashboard: {e}")
 
     
@@ -1,7 +1,317 @@
 import pandas as pd
 import numpy as np
-from scipy.signal import argrelextrema
-import talib
+from numpy.lib.stride_tricks import sliding_window_view
+from numba import njit, prange
+
+# Swing lows validated per parallel kernel call between overlap/early-stop checks
+SWING_LOW_CHUNK_SIZE = 1024
+
+
+@njit(cache=True)
+def _fit_centred_parabola(y):
+    """
+    Least-squares parabola a*t^2 + b*t + c through y at t = x - (n - 1) / 2 for x = 0..n-1.
+    Returns (a, b_centred, c_centred, mean_y) from a single pass over y.
+    """
+    n = y.size
+    # Centre x so the odd power sums vanish and the normal equations stay well conditioned.
+    # For t = x - m over x = 0..n-1 the even power sums have closed forms in n.
+    m = (n - 1) / 2.0
+    s2 = n * (n * n - 1) / 12.0
+    s4 = n * (n * n - 1) * (3.0 * n * n - 7) / 240.0
+    sy = 0.0
+    sty = 0.0
+    stty = 0.0
+    for i in range(n):
+        t = i - m
+        tt = t * t
+        sy += y[i]
+        sty += t * y[i]
+        stty += tt * y[i]
+
+    # Cramer's rule on the decoupled (a, c) pair; b follows directly
+    det = n * s4 - s2 * s2
+    a = (n * stty - s2 * sy) / det
+    c_centred = (s4 * sy - s2 * stty) / det
+    b_centred = sty / s2
+    return a, b_centred, c_centred, sy / n
+
+
+@njit(cache=True)
+def _uncentre_parabola(a, b_centred, c_centred, n):
+    """Shift centred coefficients back to x = 0..n-1; returns (b, c, vertex_x)."""
+    m = (n - 1) / 2.0
+    b = b_centred - 2.0 * a * m
+    c = (a * m - b_centred) * m + c_centred
+    vertex_x = -b / (2 * a) if a != 0 else np.nan
+    return b, c, vertex_x
+
+
+@njit(cache=True)
+def _centred_r_squared(y, a, b_centred, c_centred, mean_y):
+    """Coefficient of determination of a centred parabola fit (0.0 for a flat series)."""
+    n = y.size
+    m = (n - 1) / 2.0
+    ss_res = 0.0
+    ss_tot = 0.0
+    for i in range(n):
+        t = i - m
+        residual = y[i] - ((a * t + b_centred) * t + c_centred)
+        ss_res += residual * residual
+        ss_tot += (y[i] - mean_y) ** 2
+    return 0.0 if ss_tot == 0 else 1 - ss_res / ss_tot
+
+
+@njit(cache=True)
+def fit_cup(y):
+    """
+    Least-squares parabola a*x^2 + b*x + c through y at x = 0..n-1.
+    Returns (a, b, c, r_squared, vertex_x) without any temporary arrays.
+    """
+    a, b_centred, c_centred, mean_y = _fit_centred_parabola(y)
+    r_squared = _centred_r_squared(y, a, b_centred, c_centred, mean_y)
+    b, c, vertex_x = _uncentre_parabola(a, b_centred, c_centred, y.size)
+    return a, b, c, r_squared, vertex_x
+
+
+@njit(cache=True)
+def wilder_atr(highs, lows, closes, period):
+    """
+    Average True Range with Wilder smoothing, matching talib.ATR: the first `period`
+    values are NaN and the first ATR is the simple mean of the first `period` true ranges.
+    """
+    n = highs.size
+    atr = np.full(n, np.nan)
+    if n <= period:
+        return atr
+    total = 0.0
+    for i in range(1, n):
+        true_range = max(highs[i] - lows[i], abs(highs[i] - closes[i - 1]), abs(lows[i] - closes[i - 1]))
+        if i < period:
+            total += true_range
+        elif i == period:
+            atr[i] = (total + true_range) / period
+        else:
+            atr[i] = (atr[i - 1] * (period - 1) + true_range) / period
+    return atr
+
+
+@njit(cache=True)
+def relative_extrema(data, order):
+    """
+    Indices of strict local maxima and minima of data over `order` points on each side,
+    matching scipy.signal.argrelextrema(data, np.greater/np.less, order=order) with its
+    default mode='clip'. Both are found in one pass without shifted copies of data.
+    """
+    n = data.size
+    is_max = np.zeros(n, dtype=np.bool_)
+    is_min = np.zeros(n, dtype=np.bool_)
+    for i in range(n):
+        greater = True
+        less = True
+        for shift in range(1, order + 1):
+            before = data[max(i - shift, 0)]
+            after = data[min(i + shift, n - 1)]
+            greater = greater and data[i] > before and data[i] > after
+            less = less and data[i] < before and data[i] < after
+            if not (greater or less):
+                break
+        is_max[i] = greater
+        is_min[i] = less
+    return np.flatnonzero(is_max), np.flatnonzero(is_min)
+
+
+def rolling_mean(values, window):
+    """
+    Means of every full window of `window` consecutive values (len(values) - window + 1 of them).
+    Kept on pandas' running-sum algorithm: windows with equal sums are common in tick-rounded
+    prices, and summing each window directly breaks those ties differently, which moves the
+    strict extrema found on the smoothed closes.
+    """
+    return pd.Series(values).rolling(window=window).mean().to_numpy()[window - 1:]
+
+
+def forward_rolling_max(values, window):
+    """max(values[i + 1: i + 1 + window]) for every i in O(n); -inf where that span is empty."""
+    ahead = pd.Series(values[::-1]).rolling(window=window, min_periods=1).max().to_numpy()[::-1]
+    return np.append(ahead[1:], -np.inf)
+
+
+def reachable_cup_bottoms(highs, lows, swing_highs, swing_lows, cup_dur_max, min_cup_depth):
+    """
+    Swing lows that can still bottom a deep enough cup. Only bottoms with a left rim can start
+    a cup, every right rim lies within cup_dur_max bars after the bottom, and the cup depth
+    grows with the right rim price, so a bottom whose left rim and highest high in that span
+    cannot reach min_cup_depth has no valid cup.
+    """
+    left_counts = np.searchsorted(swing_highs, swing_lows, side='left')
+    has_left_rim = left_counts > 0
+    cup_bottoms = swing_lows[has_left_rim]
+    left_rim_prices = highs[swing_highs[left_counts[has_left_rim] - 1]]
+    max_right_prices = forward_rolling_max(highs, cup_dur_max)[cup_bottoms]
+    return cup_bottoms[(left_rim_prices + max_right_prices) / 2 - lows[cup_bottoms] >= min_cup_depth]
+
+
+@njit(cache=True)
+def window_mean(cumsum, start, end):
+    """Mean of the values in [start, end) from their prefix sums (cumsum[0] == 0)."""
+    return (cumsum[end] - cumsum[start]) / (end - start)
+
+
+@njit(cache=True)
+def fit_slope(y):
+    """Least-squares slope of y against x = 0..n-1 (0.0 for fewer than two points)."""
+    n = y.size
+    if n < 2:
+        return 0.0
+    m = (n - 1) / 2.0
+    sty = 0.0
+    for i in range(n):
+        sty += (i - m) * y[i]
+    return sty / (n * (n * n - 1) / 12.0)
+
+
+@njit(cache=True)
+def _check_swing_low(low_idx, highs, lows, closes, vols, atr, smooth_lows, vol_cumsum,
+                     swing_highs, swing_lows, cfg, indices, stats):
+    """
+    Validate the cups bottoming at low_idx, ignoring overlap with other patterns.
+    Fills indices (left_rim, cup_bottom, right_rim, handle_low, handle_high, breakout) and
+    stats (a, b, c, r_squared, cup_depth, handle_depth, volume_spike) for the first valid
+    right rim and returns True, or returns False if there is none.
+    """
+    (cup_dur_min, cup_dur_max, handle_dur_min, handle_dur_max, rim_diff_max, min_cup_depth,
+     retrace_max, r_squared_min, breakout_factor, spike_factor, smoothing_window,
+     vertex_min, vertex_max, min_curvature) = cfg
+    n_bars = highs.size
+
+    left_count = np.searchsorted(swing_highs, low_idx, side='left')
+    if left_count == 0:
+        return False
+
+    left_rim_idx = swing_highs[left_count - 1]  # Most recent swing high before bottom
+    left_rim_price = highs[left_rim_idx]
+    cup_bottom_price = lows[low_idx]
+
+    # Only right rims after the bottom that give an allowed cup duration
+    first_right = np.searchsorted(swing_highs, max(low_idx + 1, left_rim_idx + cup_dur_min), side='left')
+    last_right = np.searchsorted(swing_highs, left_rim_idx + cup_dur_max, side='right')
+
+    for right_pos in range(first_right, last_right):
+        right_rim_idx = swing_highs[right_pos]
+        cup_duration = right_rim_idx - left_rim_idx
+        right_rim_price = highs[right_rim_idx]
+        max_rim_price = max(left_rim_price, right_rim_price)
+
+        # Use average rim price for calculations
+        avg_rim_price = (left_rim_price + right_rim_price) / 2
+        if abs(left_rim_price - right_rim_price) / max_rim_price > rim_diff_max:
+            continue
+
+        cup_depth = avg_rim_price - cup_bottom_price
+        if cup_depth < min_cup_depth:
+            continue
+
+        # Cup data for fitting: use smoothed lows for bottom shape, skipping the first
+        # smoothing_window - 1 bars whose window would reach back past the left rim
+        y_cup = smooth_lows[left_rim_idx + smoothing_window - 1: right_rim_idx + 1]
+        # The coefficients take one pass over the cup; the residual pass for R^2 only runs
+        # once the cheaper curvature and symmetry checks have passed
+        cup_len = y_cup.size
+        a, b_centred, c_centred, mean_y = _fit_centred_parabola(y_cup)
+        if a <= min_curvature:  # Ensure sufficient upward curvature for U-shape
+            continue
+
+        # Check symmetry: vertex position roughly in middle
+        b, c, vertex_x = _uncentre_parabola(a, b_centred, c_centred, cup_len)
+        if not (vertex_min * cup_len < vertex_x < vertex_max * cup_len):
+            continue
+
+        r_squared = _centred_r_squared(y_cup, a, b_centred, c_centred, mean_y)
+        if r_squared < r_squared_min:
+            continue
+
+        # Find next swing low after right rim for handle bottom
+        next_low_pos = np.searchsorted(swing_lows, right_rim_idx, side='right')
+        if next_low_pos == swing_lows.size:
+            continue
+        handle_low_idx = swing_lows[next_low_pos]
+        handle_duration = handle_low_idx - right_rim_idx
+        if not (handle_dur_min <= handle_duration <= handle_dur_max):
+            continue
+
+        # Handle high: max high between right rim (exclusive) and handle low (inclusive)
+        handle_high_idx = right_rim_idx + 1 + np.argmax(highs[right_rim_idx + 1: handle_low_idx + 1])
+        handle_high = highs[handle_high_idx]
+        if handle_high > max_rim_price:
+            continue
+
+        # Check handle low > cup bottom and in upper half
+        handle_low = lows[handle_low_idx]
+        if handle_low < cup_bottom_price or handle_low < cup_bottom_price + 0.5 * cup_depth:
+            continue
+
+        # Handle retrace using avg rim
+        if (avg_rim_price - handle_low) / cup_depth > retrace_max:
+            continue
+
+        # Ensure the handle closes are not upward sloping
+        if fit_slope(closes[right_rim_idx + 1: handle_low_idx + 1]) > 0:
+            continue
+
+        # First candle in the next 60 whose high clears handle high + factor * ATR
+        breakout_candle_idx = -1
+        for i in range(handle_low_idx + 1, min(handle_low_idx + 61, n_bars)):
+            if not np.isnan(atr[i]) and highs[i] > handle_high + breakout_factor * atr[i]:
+                breakout_candle_idx = i
+                break
+        if breakout_candle_idx < 0:
+            continue
+
+        # Volume spike is recorded as a bonus, not required
+        avg_volume_cup_handle = window_mean(vol_cumsum, left_rim_idx, breakout_candle_idx)
+        volume_spike = vols[breakout_candle_idx] > avg_volume_cup_handle * spike_factor
+
+        # Volume should decrease in the cup bottom
+        cup_mid = left_rim_idx + cup_duration // 2
+        vol_bottom = window_mean(vol_cumsum, cup_mid - 10, cup_mid + 10) if cup_duration > 20 else avg_volume_cup_handle
+        vol_sides = (window_mean(vol_cumsum, left_rim_idx, left_rim_idx + 20) + window_mean(vol_cumsum, right_rim_idx - 20, right_rim_idx)) / 2
+        if vol_bottom > vol_sides:
+            continue
+
+        indices[0] = left_rim_idx
+        indices[1] = low_idx
+        indices[2] = right_rim_idx
+        indices[3] = handle_low_idx
+        indices[4] = handle_high_idx
+        indices[5] = breakout_candle_idx
+        stats[0] = a
+        stats[1] = b
+        stats[2] = c
+        stats[3] = r_squared
+        stats[4] = cup_depth
+        stats[5] = avg_rim_price - handle_low
+        stats[6] = 1.0 if volume_spike else 0.0
+        return True  # Keep only the first valid right rim for this bottom
+
+    return False
+
+
+@njit(cache=True, parallel=True)
+def _check_swing_lows(low_chunk, highs, lows, closes, vols, atr, smooth_lows, vol_cumsum,
+                      swing_highs, swing_lows, cfg):
+    """
+    Run _check_swing_low for every bottom in low_chunk in parallel. Rows whose bottom
+    has no valid cup keep a left rim of -1.
+    """
+    n = low_chunk.size
+    indices = np.full((n, 6), -1, dtype=np.int64)
+    stats = np.empty((n, 7), dtype=np.float64)
+    for k in prange(n):
+        _check_swing_low(low_chunk[k], highs, lows, closes, vols, atr, smooth_lows, vol_cumsum,
+                         swing_highs, swing_lows, cfg, indices[k], stats[k])
+    return indices, stats
+
 
 class PatternDetector:
     """
@@ -28,193 +338,117 @@ class PatternDetector:
             }
         else:
             self.config = config
-        
-        self.patterns = []
 
-    def _calculate_r_squared(self, y_true, y_pred):
-        """Calculates the R-squared value for the parabolic fit."""
-        ss_res = np.sum((y_true - y_pred) ** 2)
-        ss_tot = np.sum((y_true - np.mean(y_true)) ** 2)
-        if ss_tot == 0:
-            return 0.0
-        return 1 - (ss_res / ss_tot)
+        self.patterns = []
 
     def find_patterns(self, df: pd.DataFrame):
         """
         Main method to find all valid Cup and Handle patterns in the dataframe.
         """
         print("Starting pattern detection...")
-        # Ensure dataframe has integer index for easier iloc access
-        df = df.reset_index(drop=True)
-        # Assume 'timestamp' column exists; if not, adjust accordingly
-        if 'timestamp' not in df.columns:
-            df['timestamp'] = df.index  # Fallback to index if no timestamp
-
-        df['ATR'] = talib.ATR(df['high'], df['low'], df['close'], timeperiod=14)
-        avg_candle_size = (df['high'] - df['low']).mean()
-        print(f"Average candle size: {avg_candle_size:.2f}")
-        
-        # Smooth prices for better extrema detection
-        smooth_prices = df['close'].rolling(window=self.config['smoothing_window']).mean().dropna()
-        
-        # Find local maxima and minima using argrelextrema
-        local_max = argrelextrema(smooth_prices.values, np.greater, order=self.config['extrema_window'])[0]
-        local_min = argrelextrema(smooth_prices.values, np.less, order=self.config['extrema_window'])[0]
-        
-        # Refine with prominence
-        prominence = self.config['extrema_prominence_factor'] * avg_candle_size
-        swing_highs = [i for i in local_max if df['high'].iloc[max(0, i-5):min(len(df), i+6)].max() - df['high'].iloc[i] < prominence]
-        swing_lows = [i for i in local_min if df['low'].iloc[i] - df['low'].iloc[max(0, i-5):min(len(df), i+6)].min() < prominence]
-        
-        print(f"Found {len(swing_highs)} swing highs and {len(swing_lows)} swing lows.")
-
-        # To avoid duplicates, track covered ranges
-        covered_ranges = []
+        # Assume 'timestamp' column exists; if not, fall back to the row position. The
+        # extension array keeps the lookups below returning pd.Timestamp scalars.
+        timestamps = df['timestamp'].array if 'timestamp' in df.columns else np.arange(len(df))
 
-        for low_idx in swing_lows:
-            possible_left_rims = [h for h in swing_highs if h < low_idx]
-            if not possible_left_rims:
-                continue
-            
-            left_rim_idx = max(possible_left_rims)  # Most recent swing high before bottom
-            left_rim_price = df['high'].iloc[left_rim_idx]
+        # Pull every column into a contiguous float64 array once; the loop below only indexes
+        # arrays, and integer prices would break the +/-inf padding and recompile the kernels
+        highs = df['high'].to_numpy(dtype=np.float64)
+        lows = df['low'].to_numpy(dtype=np.float64)
+        closes = df['close'].to_numpy(dtype=np.float64)
+        vols = df['volume'].to_numpy(dtype=np.float64)
+        n_bars = len(highs)
 
-            possible_right_rims = [h for h in swing_highs if h > low_idx]
-            if not possible_right_rims:
-                continue
+        atr = wilder_atr(highs, lows, closes, 14)
+        # Prefix sums turn every volume window mean below into an O(1) lookup
+        vol_cumsum = np.concatenate(([0.0], np.cumsum(vols, dtype=np.float64)))
 
-            for right_rim_idx in possible_right_rims:
-                cup_duration = right_rim_idx - left_rim_idx
-                if not (self.config["cup_duration"][0] <= cup_duration <= self.config["cup_duration"][1]):
-                    continue
-                
-                right_rim_price = df['high'].iloc[right_rim_idx]
-                
-                # Use average rim price for calculations
-                avg_rim_price = (left_rim_price + right_rim_price) / 2
-                rim_level_diff = abs(left_rim_price - right_rim_price) / max(left_rim_price, right_rim_price)
-                if rim_level_diff > self.config["rim_level_diff_max"]:
-                    continue
-                
-                cup_bottom_price = df['low'].iloc[low_idx]
-                cup_depth = avg_rim_price - cup_bottom_price
-                if cup_depth < self.config["cup_depth_min_factor"] * avg_candle_size:
-                    continue
-
-                # Cup data for fitting: use smoothed lows for bottom shape
-                cup_data = df.iloc[left_rim_idx: right_rim_idx + 1]
-                cup_smooth_lows = cup_data['low'].rolling(window=self.config['smoothing_window']).mean().dropna()
-                x_cup = np.arange(len(cup_smooth_lows))
-                y_cup = cup_smooth_lows.values
-                
-                # Fit parabola (degree 2)
-                coeffs = np.polyfit(x_cup, y_cup, 2)
-                if coeffs[0] <= self.config['min_curvature']:  # Ensure sufficient upward curvature for U-shape
-                    continue
-                    
-                p = np.poly1d(coeffs)
-                y_pred = p(x_cup)
-                r_squared = self._calculate_r_squared(y_cup, y_pred)
-                
-                if r_squared < self.config["r_squared_min"]:
-                    continue
-
-                # Check symmetry: vertex position roughly in middle
-                vertex_x = -coeffs[1] / (2 * coeffs[0])
-                cup_len = len(x_cup)
-                if not (self.config['vertex_position_min'] * cup_len < vertex_x < self.config['vertex_position_max'] * cup_len):
-                    continue  # Asymmetric if vertex not centered
-
-                # Find next swing low after right rim for handle bottom
-                possible_handle_lows = [l for l in swing_lows if l > right_rim_idx]
-                if not possible_handle_lows:
-                    continue
-                
-                handle_low_idx = min(possible_handle_lows)  # Next swing low
-                handle_duration = handle_low_idx - right_rim_idx
-                if not (self.config["handle_duration"][0] <= handle_duration <= self.config["handle_duration"][1]):
-                    continue
+        avg_candle_size = (highs - lows).mean()
+        print(f"Average candle size: {avg_candle_size:.2f}")
 
-                # Handle high: max high between right rim (exclusive) and handle low (inclusive)
-                handle_slice = df.iloc[right_rim_idx + 1: handle_low_idx + 1]
-                if handle_slice.empty:
-                    continue
-                handle_high_idx = handle_slice['high'].idxmax()
-                handle_high = df['high'].iloc[handle_high_idx]
-                
-                # Check handle high <= max rim
-                if handle_high > max(left_rim_price, right_rim_price):
-                    continue
+        # Smooth prices for better extrema detection
+        config = self.config
+        smoothing_window = int(config['smoothing_window'])
+        smooth_prices = rolling_mean(closes, smoothing_window)
 
-                handle_low = df['low'].iloc[handle_low_idx]
+        # Find local maxima and minima in a single pass over the contiguous smoothed closes
+        local_max, local_min = relative_extrema(smooth_prices, int(config['extrema_window']))
 
-                # Check handle low > cup bottom and in upper half
-                if handle_low < cup_bottom_price or handle_low < cup_bottom_price + 0.5 * cup_depth:
-                    continue
+        # Refine with prominence
+        prominence = config['extrema_prominence_factor'] * avg_candle_size
+        # Smoothed lows for the cup fit, computed once and sliced per candidate cup; the
+        # first smoothing_window - 1 bars have no full window and are never sliced
+        smooth_lows = np.full(n_bars, np.nan)
+        smooth_lows[smoothing_window - 1:] = rolling_mean(lows, smoothing_window)
 
-                # Handle retrace using avg rim
-                handle_retrace = (avg_rim_price - handle_low) / cup_depth
-                if handle_retrace > self.config["handle_retrace_max"]:
-                    continue
+        # Max/min over the same clipped 11-bar window around every bar, computed once
+        high_roll = sliding_window_view(np.pad(highs, 5, constant_values=-np.inf), 11).max(axis=1)
+        low_roll = sliding_window_view(np.pad(lows, 5, constant_values=np.inf), 11).min(axis=1)
+        swing_highs = local_max[high_roll[local_max] - highs[local_max] < prominence]
+        swing_lows = local_min[lows[local_min] - low_roll[local_min] < prominence]
+        
+        print(f"Found {len(swing_highs)} swing highs and {len(swing_lows)} swing lows.")
 
-                # Optional: Check downward slope in handle (linear fit on closes)
-                x_handle = np.arange(len(handle_slice))
-                y_handle = handle_slice['close'].values
-                slope, _ = np.polyfit(x_handle, y_handle, 1)[:2]
-                if slope > 0:  # Ensure not upward sloping
-                    continue
+        # Read the config on every call so later changes to self.config take effect; the
+        # int/float coercion keeps one compiled kernel signature whatever types it holds
+        min_cup_depth = float(config["cup_depth_min_factor"] * avg_candle_size)
+        cup_dur_min, cup_dur_max = (int(v) for v in config["cup_duration"])
+        handle_dur_min, handle_dur_max = (int(v) for v in config["handle_duration"])
+        cfg = (
+            cup_dur_min, cup_dur_max,
+            handle_dur_min, handle_dur_max,
+            float(config["rim_level_diff_max"]),
+            min_cup_depth,
+            float(config["handle_retrace_max"]),
+            float(config["r_squared_min"]),
+            float(config["breakout_atr_factor"]),
+            float(config["volume_spike_factor"]),
+            smoothing_window,
+            float(config["vertex_position_min"]),
+            float(config["vertex_position_max"]),
+            float(config["min_curvature"]),
+        )
+        max_patterns = 30  # Stop after finding 30 patterns
+        swing_highs = swing_highs.astype(np.int64)
+        swing_lows = swing_lows.astype(np.int64)
+        kernel_args = (
+            highs, lows, closes, vols, atr, smooth_lows, vol_cumsum,
+            swing_highs, swing_lows, cfg
+        )
 
-                # Search for breakout after handle low
-                breakout_search_start_idx = handle_low_idx + 1
-                if breakout_search_start_idx >= len(df):
-                    continue
-                breakout_search_area = df.iloc[breakout_search_start_idx: breakout_search_start_idx + 60]
-                
-                breakout_candle_idx = None
-                for i in range(len(breakout_search_area)):
-                    candle_idx = breakout_search_start_idx + i
-                    candle = df.iloc[candle_idx]
-                    atr_val = candle['ATR']
-                    if np.isnan(atr_val):
-                        continue
-                    if candle['high'] > handle_high + self.config["breakout_atr_factor"] * atr_val:
-                        breakout_candle_idx = candle_idx
-                        break
-                
-                if breakout_candle_idx is None:
-                    continue
+        # All swing lows stay available to the kernel as handle lows
+        cup_bottoms = reachable_cup_bottoms(highs, lows, swing_highs, swing_lows, cup_dur_max, min_cup_depth)
 
-                # Volume spike check (make semi-mandatory by preferring, but keep bonus)
-                avg_volume_cup_handle = df.iloc[left_rim_idx:breakout_candle_idx]['volume'].mean()
-                volume_spike = df['volume'].iloc[breakout_candle_idx] > (avg_volume_cup_handle * self.config["volume_spike_factor"])
+        # To avoid duplicates, track where the last accepted range ends. Left rims never
+        # decrease in swing-low order, so only the most recent range can overlap a candidate.
+        last_end = -1
 
-                # Optional volume decrease in cup bottom
-                cup_mid = left_rim_idx + cup_duration // 2
-                vol_bottom = df.iloc[cup_mid - 10:cup_mid + 10]['volume'].mean() if cup_duration > 20 else avg_volume_cup_handle
-                vol_sides = (df.iloc[left_rim_idx:left_rim_idx+20]['volume'].mean() + df.iloc[right_rim_idx-20:right_rim_idx]['volume'].mean()) / 2
-                if vol_bottom > vol_sides:
-                    continue  # Skip if volume not decreasing in bottom
+        # Bottoms are validated independently in parallel, a chunk at a time so the search
+        # can still stop early; accepting them in order keeps the overlap check sequential
+        for chunk_start in range(0, len(cup_bottoms), SWING_LOW_CHUNK_SIZE):
+            low_chunk = cup_bottoms[chunk_start:chunk_start + SWING_LOW_CHUNK_SIZE]
+            indices, stats = _check_swing_lows(low_chunk, *kernel_args)
+            for k in np.flatnonzero(indices[:, 0] >= 0):
+                left_rim_idx, low_idx, right_rim_idx, handle_low_idx, handle_high_idx, breakout_candle_idx = (int(i) for i in indices[k])
 
                 # Check for overlap with previous patterns to avoid duplicates
-                pattern_range = (left_rim_idx, breakout_candle_idx)
-                if any(max(start, left_rim_idx) < min(end, breakout_candle_idx) for start, end in covered_ranges):
-                    continue  # Skip if overlaps with previous
-                covered_ranges.append(pattern_range)
+                if left_rim_idx < last_end:
+                    continue
+                last_end = breakout_candle_idx
 
-                # All checks passed
+                a, b, c, r_squared, cup_depth, handle_depth, volume_spike = stats[k]
                 pattern_info = {
                     "pattern_id": len(self.patterns) + 1,
                     "status": "valid",
                     "reason": "All rules passed",
-                    "start_time": df.iloc[left_rim_idx]['timestamp'],
-                    "end_time": df.iloc[breakout_candle_idx]['timestamp'],
+                    "start_time": timestamps[left_rim_idx],
+                    "end_time": timestamps[breakout_candle_idx],
                     "cup_depth": cup_depth,
-                    "cup_duration": cup_duration,
-                    "handle_depth": avg_rim_price - handle_low,
-                    "handle_duration": handle_duration,
+                    "cup_duration": right_rim_idx - left_rim_idx,
+                    "handle_depth": handle_depth,
+                    "handle_duration": handle_low_idx - right_rim_idx,
                     "r_squared_fit": r_squared,
-                    "breakout_candle_timestamp": df.iloc[breakout_candle_idx]['timestamp'],
-                    "volume_spike": volume_spike,
+                    "breakout_candle_timestamp": timestamps[breakout_candle_idx],
+                    "volume_spike": bool(volume_spike),
                     "indices": {
                         "left_rim": left_rim_idx,
                         "cup_bottom": low_idx,
@@ -223,14 +457,13 @@ class PatternDetector:
                         "handle_high": handle_high_idx,
                         "breakout": breakout_candle_idx
                     },
-                    "poly_coeffs": coeffs
+                    "poly_coeffs": np.array([a, b, c])
                 }
                 self.patterns.append(pattern_info)
                 print(f"Found valid pattern #{pattern_info['pattern_id']}")
-                if len(self.patterns) >= 30:  # Stop after finding 30 patterns
-                    print("\nFound 30 valid patterns. Stopping search.")
+                if len(self.patterns) >= max_patterns:
+                    print(f"\nFound {max_patterns} valid patterns. Stopping search.")
                     return self.patterns
-                break  # Break the inner right_rim loop after finding one valid for this bottom
 
         print(f"Detection complete. Found {len(self.patterns)} valid patterns.")
-        return self.patterns
\ No newline at end of file
+        return self.patterns
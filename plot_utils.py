@@ -1,8 +1,15 @@
 import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import numpy as np
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+# Frame shared with plotting worker processes, set once per worker by _init_plot_worker
+_worker_df = None
 
 def plot_and_save(df: pd.DataFrame, pattern_info: dict, output_dir: str, html_dir: str):
     """
@@ -33,8 +40,8 @@ def plot_and_save(df: pd.DataFrame, pattern_info: dict, output_dir: str, html_di
     cup_plot_data = df.iloc[indices['left_rim']:indices['right_rim'] + 1]
     cup_x_abs = cup_plot_data['timestamp']
     x_cup_fit = np.arange(len(cup_plot_data))
-    p = np.poly1d(coeffs)
-    y_cup_fit = p(x_cup_fit)
+    a, b, c = coeffs
+    y_cup_fit = (a * x_cup_fit + b) * x_cup_fit + c  # Horner form of the fitted parabola
     
     fig.add_trace(go.Scatter(x=cup_x_abs, y=y_cup_fit, mode='lines', 
                              name='Cup Fit (R^2={:.2f})'.format(pattern_info['r_squared_fit']),
@@ -76,8 +83,42 @@ def plot_and_save(df: pd.DataFrame, pattern_info: dict, output_dir: str, html_di
     html_filename = os.path.join(html_dir, f"cup_handle_{pattern_info['pattern_id']}.html")
     
     try:
-        fig.write_image(img_filename, width=1200, height=700, engine='kaleido')
-        fig.write_html(html_filename)
+        # Convert the figure to a dict once and share it between both writers; it was
+        # built from validated graph objects, so neither needs to validate it again
+        fig_dict = fig.to_dict()
+        pio.write_image(fig_dict, img_filename, width=1200, height=700, engine='kaleido', validate=False)
+        pio.write_html(fig_dict, html_filename, validate=False)
         print(f"Successfully saved plot for pattern #{pattern_info['pattern_id']}")
     except Exception as e:
-        print(f"Error saving plot for pattern #{pattern_info['pattern_id']}: {e}")
\ No newline at end of file
+        print(f"Error saving plot for pattern #{pattern_info['pattern_id']}: {e}")
+
+
+def _init_plot_worker(df: pd.DataFrame):
+    global _worker_df
+    _worker_df = df
+
+
+def _plot_in_worker(pattern_info: dict, output_dir: str, html_dir: str):
+    print(f"\nProcessing pattern #{pattern_info['pattern_id']}...")
+    plot_and_save(_worker_df, pattern_info, output_dir, html_dir)
+
+
+def plot_patterns(df: pd.DataFrame, patterns: list, output_dir: str, html_dir: str, max_workers=None):
+    """
+    Plots and saves every pattern in `patterns`. The plots are independent, so they are
+    rendered in a pool of worker processes, each with its own Kaleido instance, and the
+    dataframe is handed to every worker once instead of once per pattern.
+    """
+    if max_workers is None:
+        max_workers = min(len(patterns), os.cpu_count() or 1)
+    if max_workers <= 1:
+        _init_plot_worker(df)
+        for pattern_info in patterns:
+            _plot_in_worker(pattern_info, output_dir, html_dir)
+        return
+    # Spawn rather than fork: the detector leaves Numba and Arrow thread pools running in this
+    # process, and forking a multithreaded process can deadlock it at exit
+    mp_context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context,
+                             initializer=_init_plot_worker, initargs=(df,)) as executor:
+        list(executor.map(partial(_plot_in_worker, output_dir=output_dir, html_dir=html_dir), patterns))
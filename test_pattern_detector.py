@@ -2,10 +2,12 @@
 
 import os
 import unittest
+from unittest import mock
 import pandas as pd
 import numpy as np
 
-from pattern_detector import PatternDetector
+import pattern_detector
+from pattern_detector import PatternDetector, fit_cup, relative_extrema, wilder_atr
 
 class TestPatternDetector(unittest.TestCase):
     @classmethod
@@ -133,6 +135,122 @@ class TestPatternDetector(unittest.TestCase):
         df = self.make_no_breakout()
         self.assertEqual(len(self.run_detector(df)), 0)
 
+    def test_integer_prices(self):
+        """Integer OHLC columns must be accepted like float ones."""
+        df = self.make_u_shape_df()
+        prices = ["open", "high", "low", "close"]
+        df[prices] = df[prices].round().astype("int64")
+        self.assertIsInstance(self.run_detector(df), list)
+
+
+class TestDetectorOnMarketData(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # First 150k one-minute bars of the bundled 2024 data; enough for a handful of patterns
+        base = os.path.dirname(__file__)
+        csv_path = os.path.join(base, "data", "your_binance_futures_data_2024.csv")
+        if not os.path.isfile(csv_path):
+            raise unittest.SkipTest(f"Market data CSV not found at {csv_path}")
+        cls.market_df = pd.read_csv(csv_path, nrows=150_000, parse_dates=["timestamp"])
+
+    @staticmethod
+    def pattern_indices(patterns):
+        return [p["indices"] for p in patterns]
+
+    def test_config_changes_after_construction_take_effect(self):
+        default = PatternDetector().find_patterns(self.market_df)
+
+        mutated_detector = PatternDetector()
+        mutated_detector.config["r_squared_min"] = 0.9
+        mutated = mutated_detector.find_patterns(self.market_df)
+
+        config = dict(PatternDetector().config, r_squared_min=0.9)
+        constructed = PatternDetector(config).find_patterns(self.market_df)
+
+        self.assertLess(len(mutated), len(default))
+        self.assertEqual(self.pattern_indices(mutated), self.pattern_indices(constructed))
+
+    def test_cup_bottom_prefilter_keeps_every_pattern(self):
+        """Skipping unreachable bottoms must not change the detected patterns."""
+        reachable_cup_bottoms = pattern_detector.reachable_cup_bottoms
+        for depth_factor in (2.0, 6.0):
+            with self.subTest(cup_depth_min_factor=depth_factor):
+                config = dict(PatternDetector().config, cup_depth_min_factor=depth_factor)
+                kept_counts = []
+
+                def counting_prefilter(highs, lows, swing_highs, swing_lows, *args):
+                    kept = reachable_cup_bottoms(highs, lows, swing_highs, swing_lows, *args)
+                    kept_counts.append((len(kept), len(swing_lows)))
+                    return kept
+
+                with mock.patch.object(pattern_detector, "reachable_cup_bottoms", counting_prefilter):
+                    filtered = PatternDetector(config).find_patterns(self.market_df)
+                with mock.patch.object(pattern_detector, "reachable_cup_bottoms",
+                                       lambda highs, lows, swing_highs, swing_lows, *args: swing_lows):
+                    unfiltered = PatternDetector(config).find_patterns(self.market_df)
+
+                kept, total = kept_counts[0]
+                self.assertLess(kept, total)
+                self.assertEqual(self.pattern_indices(filtered), self.pattern_indices(unfiltered))
+
+
+class TestFitCup(unittest.TestCase):
+    def test_matches_polyfit(self):
+        """Closed-form fit must agree with np.polyfit on a noisy cup."""
+        rng = np.random.default_rng(42)
+        x = np.arange(120)
+        y = 42000 + 0.05 * (x - 55) ** 2 + rng.normal(0, 5, x.size)
+
+        coeffs = np.polyfit(x, y, 2)
+        y_pred = np.poly1d(coeffs)(x)
+        expected_r2 = 1 - np.sum((y - y_pred) ** 2) / np.sum((y - y.mean()) ** 2)
+
+        a, b, c, r_squared, vertex_x = fit_cup(y)
+        np.testing.assert_allclose([a, b, c], coeffs, rtol=1e-8)
+        self.assertAlmostEqual(r_squared, expected_r2, places=9)
+        self.assertAlmostEqual(vertex_x, -coeffs[1] / (2 * coeffs[0]), places=6)
+
+    def test_flat_series_has_zero_r_squared(self):
+        a, _, _, r_squared, _ = fit_cup(np.full(50, 100.0))
+        self.assertAlmostEqual(a, 0.0)
+        self.assertEqual(r_squared, 0.0)
+
+
+class TestWilderAtr(unittest.TestCase):
+    # True ranges from bar 1 on: 3, 1, 3.5 (gap below the previous close), 6 (gap above), 3
+    highs = np.array([11.0, 13.0, 13.0, 12.0, 16.0, 13.0])
+    lows = np.array([9.0, 10.0, 12.0, 9.0, 11.0, 12.0])
+    closes = np.array([10.0, 12.0, 12.5, 10.0, 15.0, 12.5])
+
+    def test_matches_hand_computed_values(self):
+        atr = wilder_atr(self.highs, self.lows, self.closes, 3)
+        # First `period` values are NaN while the seed window fills
+        self.assertTrue(np.isnan(atr[:3]).all())
+        # Seed is the mean of the first three true ranges
+        self.assertAlmostEqual(atr[3], (3 + 1 + 3.5) / 3)
+        # Then Wilder smoothing: (prev * (period - 1) + tr) / period
+        self.assertAlmostEqual(atr[4], (2.5 * 2 + 6) / 3)
+        self.assertAlmostEqual(atr[5], (11 / 3 * 2 + 3) / 3)
+
+    def test_series_not_longer_than_period_is_all_nan(self):
+        for n in (2, 3):
+            atr = wilder_atr(self.highs[:n], self.lows[:n], self.closes[:n], 3)
+            self.assertEqual(atr.size, n)
+            self.assertTrue(np.isnan(atr).all())
+
+
+class TestRelativeExtrema(unittest.TestCase):
+    def test_strict_extrema_within_order(self):
+        """Plateaus and the clipped edges never count; peaks must beat every neighbour in range."""
+        data = np.array([5.0, 3.0, 4.0, 1.0, 6.0, 6.0, 2.0, 7.0, 0.0, 8.0])
+        local_max, local_min = relative_extrema(data, 1)
+        np.testing.assert_array_equal(local_max, [2, 7])
+        np.testing.assert_array_equal(local_min, [1, 3, 6, 8])
+
+        local_max, local_min = relative_extrema(data, 2)
+        self.assertEqual(local_max.size, 0)
+        np.testing.assert_array_equal(local_min, [3, 8])
+
 
 if __name__ == "__main__":
     unittest.main()